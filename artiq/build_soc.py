@@ -1,15 +1,18 @@
 import os
 import subprocess
 
+from migen.build.xilinx.vivado import XilinxVivadoToolchain
+
 from misoc.cores import identifier
 from misoc.integration.builder import *
 
 from artiq.gateware.amp import AMPSoC
+from artiq.gateware.vivado import VivadoToolchain
 from artiq import __version__ as artiq_version
 from artiq import __artiq_dir__ as artiq_dir
 
 
-__all__ = ["add_identifier", "build_artiq_soc"]
+__all__ = ["add_identifier", "add_cdc_max_delay", "build_artiq_soc"]
 
 
 def get_identifier_string(soc, suffix="", add_class_name=True):
@@ -30,6 +33,21 @@ def add_identifier(soc, *args, **kwargs):
     soc.config["IDENTIFIER_STR"] = identifier_str
 
 
+def add_cdc_max_delay(platform, clk_a, clk_b, delay):
+    """Bound the datapath delay (in ns) of the paths between two
+    asynchronous clocks, in both directions, instead of cutting them with
+    a false path. MultiReg and AsyncResetSynchronizer inputs keep their own
+    false path constraints, which take precedence.
+
+    Falls back to a false path on toolchains other than Vivado."""
+    if not isinstance(platform.toolchain, XilinxVivadoToolchain):
+        platform.add_false_path_constraints(clk_a, clk_b)
+        return
+    toolchain = VivadoToolchain.of_platform(platform)
+    for from_, to in (clk_a, clk_b), (clk_b, clk_a):
+        toolchain.add_max_delay_constraint(platform, from_, to, delay)
+
+
 
 def build_artiq_soc(soc, argdict):
     firmware_dir = os.path.join(artiq_dir, "firmware")
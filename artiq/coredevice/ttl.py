@@ -496,7 +496,9 @@ class TTLClockGen:
 
         Due to the way the clock generator operates, frequency tuning words
         that are not powers of two cause jitter of one RTIO clock cycle at the
-        output."""
+        output. With SERDES-based clock generators, the accumulator is
+        evaluated at each SERDES sample and the jitter is reduced to one
+        fine RTIO period."""
         rtio_output(self.target, frequency)
 
     @kernel
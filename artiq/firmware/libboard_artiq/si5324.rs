@@ -89,6 +89,12 @@ fn map_frequency_settings(settings: &FrequencySettings) -> Result<FrequencySetti
 }
 
 fn write(reg: u8, val: u8) -> Result<()> {
+    write_many(reg, &[val])
+}
+
+// Writes consecutive registers in one transaction, using the register
+// address auto-increment of the Si5324.
+fn write_many(reg: u8, data: &[u8]) -> Result<()> {
     i2c::start(BUSNO).unwrap();
     if !i2c::write(BUSNO, ADDRESS << 1).unwrap() {
         return Err("Si5324 failed to ack write address")
@@ -96,8 +102,10 @@ fn write(reg: u8, val: u8) -> Result<()> {
     if !i2c::write(BUSNO, reg).unwrap() {
         return Err("Si5324 failed to ack register")
     }
-    if !i2c::write(BUSNO, val).unwrap() {
-        return Err("Si5324 failed to ack value")
+    for &val in data {
+        if !i2c::write(BUSNO, val).unwrap() {
+            return Err("Si5324 failed to ack value")
+        }
     }
     i2c::stop(BUSNO).unwrap();
     Ok(())
@@ -229,21 +237,25 @@ pub fn setup(settings: &FrequencySettings, input: Input) -> Result<()> {
     write(4,   (read(4)? & 0x3f) | (0b00 << 6))?;         // AUTOSEL_REG=b00
     write(6,   (read(6)? & 0xc0) | 0b111111)?;            // SFOUT2_REG=b111 SFOUT1_REG=b111
     write(25,  (s.n1_hs  << 5 ) as u8)?;
-    write(31,  (s.nc1_ls >> 16) as u8)?;
-    write(32,  (s.nc1_ls >> 8 ) as u8)?;
-    write(33,  (s.nc1_ls)       as u8)?;
-    write(34,  (s.nc1_ls >> 16) as u8)?;                  // write to NC2_LS as well
-    write(35,  (s.nc1_ls >> 8 ) as u8)?;
-    write(36,  (s.nc1_ls)       as u8)?;
-    write(40,  (s.n2_hs  << 5 ) as u8 | (s.n2_ls  >> 16) as u8)?;
-    write(41,  (s.n2_ls  >> 8 ) as u8)?;
-    write(42,  (s.n2_ls)        as u8)?;
-    write(43,  (s.n31    >> 16) as u8)?;
-    write(44,  (s.n31    >> 8)  as u8)?;
-    write(45,  (s.n31)          as u8)?;
-    write(46,  (s.n32    >> 16) as u8)?;
-    write(47,  (s.n32    >> 8)  as u8)?;
-    write(48,  (s.n32)          as u8)?;
+    write_many(31, &[
+        (s.nc1_ls >> 16) as u8,
+        (s.nc1_ls >> 8 ) as u8,
+        (s.nc1_ls)       as u8,
+        (s.nc1_ls >> 16) as u8,                           // write to NC2_LS as well
+        (s.nc1_ls >> 8 ) as u8,
+        (s.nc1_ls)       as u8
+    ])?;
+    write_many(40, &[
+        (s.n2_hs  << 5 ) as u8 | (s.n2_ls  >> 16) as u8,
+        (s.n2_ls  >> 8 ) as u8,
+        (s.n2_ls)        as u8,
+        (s.n31    >> 16) as u8,
+        (s.n31    >> 8)  as u8,
+        (s.n31)          as u8,
+        (s.n32    >> 16) as u8,
+        (s.n32    >> 8)  as u8,
+        (s.n32)          as u8
+    ])?;
     write(137, read(137)? | 0x01)?;                       // FASTLOCK=1
     write(136, read(136)? | 0x40)?;                       // ICAL=1
 
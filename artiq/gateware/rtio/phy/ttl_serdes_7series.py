@@ -124,3 +124,10 @@ class Input_8X(ttl_serdes_generic.InOut):
         serdes = _ISERDESE2_8X(pad, pad_n)
         self.submodules += serdes
         ttl_serdes_generic.InOut.__init__(self, serdes)
+
+
+class ClockGen_8X(ttl_serdes_generic.ClockGen):
+    def __init__(self, pad, pad_n=None, ftw_width=24):
+        serdes = _OSERDESE2_8X(pad, pad_n)
+        self.submodules += serdes
+        ttl_serdes_generic.ClockGen.__init__(self, serdes, ftw_width)
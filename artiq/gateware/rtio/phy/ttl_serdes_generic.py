@@ -124,3 +124,36 @@ class InOut(Module):
         self.submodules += pe
         self.comb += pe.i.eq(serdes.i ^ Replicate(i_d, serdes_width))
         self.sync.rio_phy += self.rtlink.i.fine_ts.eq(pe.o)
+
+
+class ClockGen(Module):
+    def __init__(self, serdes, ftw_width=24):
+        serdes_width = len(serdes.o)
+        fine_ts_width = log2_int(serdes_width)
+        self.rtlink = rtlink.Interface(rtlink.OInterface(ftw_width))
+
+        # # #
+
+        ftw = Signal(ftw_width)
+        acc = Signal(ftw_width)
+        self.sync.rio += If(self.rtlink.o.stb, ftw.eq(self.rtlink.o.data))
+        self.sync.rio_phy += [
+            acc.eq(acc + ftw),
+            # rtlink takes precedence over regular acc increments
+            If(self.rtlink.o.stb,
+                If(self.rtlink.o.data != 0,
+                    # known phase on frequency write: at rising edge
+                    acc.eq(2**(ftw_width - 1))
+                ).Else(
+                    # set output to 0 on stop
+                    acc.eq(0)
+                )
+            )
+        ]
+
+        # Accumulator phase at each SERDES sample, with fine_ts_width
+        # extra fractional bits.
+        for i in range(serdes_width):
+            phase = Signal(ftw_width + fine_ts_width)
+            self.comb += phase.eq(Cat(C(0, fine_ts_width), acc) + i*ftw)
+            self.sync.rio_phy += serdes.o[i].eq(phase[-1])
@@ -32,9 +32,12 @@ class _RTIOCRG(Module, AutoCSR):
         self.clock_domains.cd_rtio = ClockDomain()
         self.clock_domains.cd_rtiox4 = ClockDomain(reset_less=True)
 
+        # The Si5324 output and the RTIO clock are both at 125MHz
+        self.rtio_clk_period = 8.0
+
         clk_synth = platform.request("si5324_clkout_fabric")
         clk_synth_se = Signal()
-        platform.add_period_constraint(clk_synth.p, 8.0)
+        platform.add_period_constraint(clk_synth.p, self.rtio_clk_period)
         self.specials += [
             Instance("IBUFGDS",
                 p_DIFF_TERM="TRUE", p_IBUF_LOW_PWR="FALSE",
@@ -50,7 +53,8 @@ class _RTIOCRG(Module, AutoCSR):
                      p_STARTUP_WAIT="FALSE", o_LOCKED=pll_locked,
                      p_BANDWIDTH="HIGH",
                      p_REF_JITTER1=0.001,
-                     p_CLKIN1_PERIOD=8.0, p_CLKIN2_PERIOD=8.0,
+                     p_CLKIN1_PERIOD=self.rtio_clk_period,
+                     p_CLKIN2_PERIOD=self.rtio_clk_period,
                      i_CLKIN2=clk_synth_se,
                      # Warning: CLKINSEL=0 means CLKIN2 is selected
                      i_CLKINSEL=0,
@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 
 import argparse
+from fractions import Fraction
 
 from migen import *
 from migen.genlib.resetsync import AsyncResetSynchronizer
 from migen.genlib.cdc import MultiReg
+from migen.genlib.io import DDROutput
 from migen.build.generic_platform import *
 from migen.build.xilinx.vivado import XilinxVivadoToolchain
 from migen.build.xilinx.ise import XilinxISEToolchain
@@ -15,30 +17,56 @@ from misoc.targets.kc705 import MiniSoC, soc_kc705_args, soc_kc705_argdict
 from misoc.integration.builder import builder_args, builder_argdict
 
 from artiq.gateware.amp import AMPSoC
+from artiq.gateware.vivado import VivadoToolchain
 from artiq.gateware import rtio, nist_clock, nist_qc2
 from artiq.gateware.rtio.phy import ttl_simple, ttl_serdes_7series, dds, spi2
 from artiq.build_soc import *
 
 
+def _rtio_pll_settings(ref_freq, rtio_clk_freq):
+    # Returns DIVCLK_DIVIDE, CLKFBOUT_MULT and the output dividers for
+    # rtiox4, rtio and the 100MHz ext_clkout, using the lowest VCO
+    # frequency within the PLLE2 limits (-2 speed grade).
+    ref_freq = Fraction(ref_freq)
+    rtio_clk_freq = Fraction(rtio_clk_freq)
+    if 4*rtio_clk_freq > 741*10**6:
+        raise ValueError("RTIO frequency too high for the PLL outputs")
+    for divclk_divide in range(1, 57):
+        if ref_freq/divclk_divide < 19*10**6:
+            break
+        for clkfbout_mult in range(2, 65):
+            vco_freq = ref_freq*clkfbout_mult/divclk_divide
+            if not 800*10**6 <= vco_freq <= 1866*10**6:
+                continue
+            dividers = [vco_freq/(4*rtio_clk_freq), vco_freq/rtio_clk_freq,
+                        vco_freq/(100*10**6)]
+            if all(d.denominator == 1 and d <= 128 for d in dividers):
+                return ((divclk_divide, clkfbout_mult)
+                        + tuple(int(d) for d in dividers))
+    raise ValueError("RTIO frequency cannot be generated by the PLL")
+
+
 class _RTIOCRG(Module, AutoCSR):
-    def __init__(self, platform, rtio_internal_clk, use_sma=True):
+    def __init__(self, platform, rtio_internal_clk, rtio_clk_freq=125e6,
+                 use_sma=True):
         self._clock_sel = CSRStorage()
         self._pll_reset = CSRStorage(reset=1)
         self._pll_locked = CSRStatus()
         self.clock_domains.cd_rtio = ClockDomain()
         self.clock_domains.cd_rtiox4 = ClockDomain(reset_less=True)
 
-        # 100 MHz when using 125MHz input
-        self.clock_domains.cd_ext_clkout = ClockDomain(reset_less=True)
-        platform.add_period_constraint(self.cd_ext_clkout.clk, 5.0)
-        if use_sma:
-            ext_clkout = platform.request("user_sma_gpio_p_33")
-            self.sync.ext_clkout += ext_clkout.eq(~ext_clkout)
+        # Both the internal (system clock) and the external (user SMA)
+        # reference clocks are at 125MHz.
+        ref_freq = 125e6
+        ref_period = 1e9/ref_freq
+        (divclk_divide, clkfbout_mult,
+         rtiox4_divide, rtio_divide, ext_clkout_divide) = \
+            _rtio_pll_settings(ref_freq, rtio_clk_freq)
 
         rtio_external_clk = Signal()
         if use_sma:
             user_sma_clock = platform.request("user_sma_clock")
-            platform.add_period_constraint(user_sma_clock.p, 8.0)
+            platform.add_period_constraint(user_sma_clock.p, ref_period)
             self.specials += Instance("IBUFDS",
                                       i_I=user_sma_clock.p, i_IB=user_sma_clock.n,
                                       o_O=rtio_external_clk)
@@ -47,36 +75,61 @@ class _RTIOCRG(Module, AutoCSR):
         rtio_clk = Signal()
         rtiox4_clk = Signal()
         ext_clkout_clk = Signal()
+        fb_clk = Signal()
         self.specials += [
             Instance("PLLE2_ADV",
                      p_STARTUP_WAIT="FALSE", o_LOCKED=pll_locked,
 
                      p_REF_JITTER1=0.01,
-                     p_CLKIN1_PERIOD=8.0, p_CLKIN2_PERIOD=8.0,
+                     p_CLKIN1_PERIOD=ref_period,
+                     p_CLKIN2_PERIOD=ref_period,
                      i_CLKIN1=rtio_internal_clk, i_CLKIN2=rtio_external_clk,
                      # Warning: CLKINSEL=0 means CLKIN2 is selected
                      i_CLKINSEL=~self._clock_sel.storage,
 
-                     # VCO @ 1GHz when using 125MHz input
-                     p_CLKFBOUT_MULT=8, p_DIVCLK_DIVIDE=1,
-                     i_CLKFBIN=self.cd_rtio.clk,
+                     p_CLKFBOUT_MULT=clkfbout_mult,
+                     p_DIVCLK_DIVIDE=divclk_divide,
+                     i_CLKFBIN=fb_clk,
                      i_RST=self._pll_reset.storage,
 
-                     o_CLKFBOUT=rtio_clk,
+                     o_CLKFBOUT=fb_clk,
 
-                     p_CLKOUT0_DIVIDE=2, p_CLKOUT0_PHASE=0.0,
+                     p_CLKOUT0_DIVIDE=rtiox4_divide, p_CLKOUT0_PHASE=0.0,
                      o_CLKOUT0=rtiox4_clk,
 
-                     p_CLKOUT1_DIVIDE=5, p_CLKOUT1_PHASE=0.0,
-                     o_CLKOUT1=ext_clkout_clk),
+                     p_CLKOUT1_DIVIDE=rtio_divide, p_CLKOUT1_PHASE=0.0,
+                     o_CLKOUT1=rtio_clk,
+
+                     # 100 MHz
+                     p_CLKOUT2_DIVIDE=ext_clkout_divide, p_CLKOUT2_PHASE=0.0,
+                     o_CLKOUT2=ext_clkout_clk),
             Instance("BUFG", i_I=rtio_clk, o_O=self.cd_rtio.clk),
             Instance("BUFG", i_I=rtiox4_clk, o_O=self.cd_rtiox4.clk),
-            Instance("BUFG", i_I=ext_clkout_clk, o_O=self.cd_ext_clkout.clk),
 
             AsyncResetSynchronizer(self.cd_rtio, ~pll_locked),
             MultiReg(pll_locked, self._pll_locked.status)
         ]
 
+        if use_sma and isinstance(platform.toolchain, XilinxVivadoToolchain):
+            # The PLL outputs are derived from both references, but only
+            # one of them is selected at a time.
+            VivadoToolchain.of_platform(platform).add_clock_command(platform,
+                "set_clock_groups -physically_exclusive "
+                "-group [get_clocks -of [get_nets [list {rtio} {rtiox4}]] "
+                    "-filter {{MASTER_CLOCK == {sma}}}] "
+                "-group [get_clocks -of [get_nets [list {rtio} {rtiox4}]] "
+                    "-filter {{MASTER_CLOCK != {sma}}}]",
+                rtio=self.cd_rtio.clk, rtiox4=self.cd_rtiox4.clk,
+                sma=user_sma_clock.p)
+
+        if use_sma:
+            ext_clkout = platform.request("user_sma_gpio_p_33")
+            ext_clkout_buf = Signal()
+            self.specials += [
+                Instance("BUFG", i_I=ext_clkout_clk, o_O=ext_clkout_buf),
+                DDROutput(1, 0, ext_clkout, ext_clkout_buf)
+            ]
+
 
 # The default user SMA voltage on KC705 is 2.5V, and the Migen platform
 # follows this default. But since the SMAs are on the same bank as the DDS,
@@ -119,7 +172,7 @@ class _StandaloneBase(MiniSoC, AMPSoC):
     }
     mem_map.update(MiniSoC.mem_map)
 
-    def __init__(self, **kwargs):
+    def __init__(self, rtio_clk_freq=125e6, **kwargs):
         MiniSoC.__init__(self,
                          cpu_type="or1k",
                          sdram_controller_type="minicon",
@@ -131,6 +184,9 @@ class _StandaloneBase(MiniSoC, AMPSoC):
         AMPSoC.__init__(self)
         add_identifier(self)
 
+        self.rtio_clk_freq = rtio_clk_freq
+        self.config["RTIO_FREQUENCY"] = str(rtio_clk_freq/1e6)
+
         if isinstance(self.platform.toolchain, XilinxVivadoToolchain):
             self.platform.toolchain.bitstream_commands.extend([
                 "set_property BITSTREAM.GENERAL.COMPRESS True [current_design]",
@@ -159,7 +215,8 @@ class _StandaloneBase(MiniSoC, AMPSoC):
         self.config["HAS_DDS"] = None
 
     def add_rtio(self, rtio_channels):
-        self.submodules.rtio_crg = _RTIOCRG(self.platform, self.crg.cd_sys.clk)
+        self.submodules.rtio_crg = _RTIOCRG(self.platform, self.crg.cd_sys.clk,
+                                            self.rtio_clk_freq)
         self.csr_devices.append("rtio_crg")
         self.config["HAS_RTIO_CLOCK_SWITCH"] = None
         self.submodules.rtio_tsc = rtio.TSC("async", glbl_fine_ts_width=3)
@@ -177,10 +234,9 @@ class _StandaloneBase(MiniSoC, AMPSoC):
         self.submodules.rtio_moninj = rtio.MonInj(rtio_channels)
         self.csr_devices.append("rtio_moninj")
 
-        self.platform.add_period_constraint(self.rtio_crg.cd_rtio.clk, 8.)
-        self.platform.add_false_path_constraints(
-            self.crg.cd_sys.clk,
-            self.rtio_crg.cd_rtio.clk)
+        rtio_clk_period = 1e9/self.rtio_clk_freq
+        add_cdc_max_delay(self.platform,
+            self.crg.cd_sys.clk, self.rtio_crg.cd_rtio.clk, rtio_clk_period)
 
         self.submodules.rtio_analyzer = rtio.Analyzer(self.rtio_tsc, self.rtio_core.cri,
                                                       self.get_native_sdram_if())
@@ -226,7 +282,7 @@ class NIST_CLOCK(_StandaloneBase):
         self.submodules += phy
         rtio_channels.append(rtio.Channel.from_phy(phy))
 
-        phy = ttl_simple.ClockGen(platform.request("la32_p"))
+        phy = ttl_serdes_7series.ClockGen_8X(platform.request("la32_p"))
         self.submodules += phy
         rtio_channels.append(rtio.Channel.from_phy(phy))
 
@@ -276,11 +332,11 @@ class NIST_QC2(_StandaloneBase):
             phy = ttl_serdes_7series.InOut_8X(
                 platform.request("ttl", i))
             self.submodules += phy
-            rtio_channels.append(rtio.Channel.from_phy(phy, ififo_depth=512))
+            rtio_channels.append(rtio.Channel.from_phy(phy))
 
         # CLK0, CLK1 are for clock generators, on backplane SMP connectors
         for i in range(2):
-            phy = ttl_simple.ClockGen(
+            phy = ttl_serdes_7series.ClockGen_8X(
                 platform.request("clkout", i))
             self.submodules += phy
             clock_generators.append(rtio.Channel.from_phy(phy))
@@ -376,7 +432,7 @@ class SMA_SPI(_StandaloneBase):
 
     def add_rtio(self, rtio_channels):
         self.submodules.rtio_crg = _RTIOCRG(self.platform, self.crg.cd_sys.clk,
-                                            use_sma=False)
+                                            self.rtio_clk_freq, use_sma=False)
         self.csr_devices.append("rtio_crg")
         self.config["HAS_RTIO_CLOCK_SWITCH"] = None
         self.submodules.rtio_tsc = rtio.TSC("async", glbl_fine_ts_width=3)
@@ -393,10 +449,9 @@ class SMA_SPI(_StandaloneBase):
         self.submodules.rtio_moninj = rtio.MonInj(rtio_channels)
         self.csr_devices.append("rtio_moninj")
 
-        self.platform.add_period_constraint(self.rtio_crg.cd_rtio.clk, 8.)
-        self.platform.add_false_path_constraints(
-            self.crg.cd_sys.clk,
-            self.rtio_crg.cd_rtio.clk)
+        rtio_clk_period = 1e9/self.rtio_clk_freq
+        add_cdc_max_delay(self.platform,
+            self.crg.cd_sys.clk, self.rtio_crg.cd_rtio.clk, rtio_clk_period)
 
         self.submodules.rtio_analyzer = rtio.Analyzer(self.rtio_tsc, self.rtio_core.cri,
                                                       self.get_native_sdram_if())
@@ -413,9 +468,8 @@ def main():
     soc_kc705_args(parser)
     parser.set_defaults(output_dir="artiq_kc705")
     parser.add_argument("-V", "--variant", default="nist_clock",
-                        help="variant: "
-                             "nist_clock/nist_qc2/sma_spi "
-                             "(default: %(default)s)")
+                        help="variant: {} (default: %(default)s)".format(
+                            "/".join(sorted(VARIANTS.keys()))))
     args = parser.parse_args()
 
     variant = args.variant.lower()
@@ -19,6 +19,13 @@ class _TB(Module):
             InOut(self.serdes))
 
 
+class _ClockGenTB(Module):
+    def __init__(self):
+        self.serdes = _FakeSerdes()
+        self.submodules.dut = ClockDomainsRenamer({"rio_phy": "sys", "rio": "sys"})(
+            ClockGen(self.serdes))
+
+
 class TestTTLSerdes(unittest.TestCase):
     def test_input(self):
         tb = _TB()
@@ -123,3 +130,32 @@ class TestTTLSerdes(unittest.TestCase):
             self.assertEqual((yield tb.serdes.o), 0b10000000)
 
         run_simulation(tb, gen())
+
+    def test_clock_gen(self):
+        tb = _ClockGenTB()
+
+        def gen():
+            yield tb.dut.rtlink.o.data.eq(0x300000)  # 16/3 RTIO cycles period
+            yield tb.dut.rtlink.o.stb.eq(1)
+            yield
+            yield tb.dut.rtlink.o.stb.eq(0)
+            yield
+            yield
+            patterns = []
+            for _ in range(6):
+                patterns.append((yield tb.serdes.o))
+                yield
+            self.assertEqual(patterns, [
+                0b11111111, 0b11111111, 0b00111111,  # falling edge at fine_ts = 6
+                0b00000000, 0b00000000, 0b11111000   # rising edge at fine_ts = 3
+            ])
+
+            yield tb.dut.rtlink.o.data.eq(0)  # stop
+            yield tb.dut.rtlink.o.stb.eq(1)
+            yield
+            yield tb.dut.rtlink.o.stb.eq(0)
+            yield
+            yield
+            self.assertEqual((yield tb.serdes.o), 0b00000000)
+
+        run_simulation(tb, gen())
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+from migen import *
+from migen.build.platforms import kc705
+
+from artiq.gateware.vivado import VivadoToolchain
+
+
+class _CDCTop(Module):
+    def __init__(self, platform):
+        self.clock_domains.cd_sys = ClockDomain("sys")
+        self.clock_domains.cd_rtio = ClockDomain("rtio")
+
+        clk200 = platform.request("clk200")
+        self.specials += Instance("IBUFGDS",
+            i_I=clk200.p, i_IB=clk200.n, o_O=self.cd_sys.clk)
+        self.comb += self.cd_rtio.clk.eq(platform.request("user_sma_clock").p)
+
+        a = Signal(name="a")
+        b = Signal(name="b")
+        self.sync += a.eq(~a)
+        self.sync.rtio += b.eq(a)
+        self.comb += platform.request("user_led").eq(b)
+
+
+class TestVivadoToolchain(unittest.TestCase):
+    def test_max_delay_after_clocks(self):
+        platform = kc705.Platform(toolchain="vivado")
+        top = _CDCTop(platform)
+        platform.add_period_constraint(top.cd_sys.clk, 8.)
+        toolchain = VivadoToolchain.of_platform(platform)
+        for from_, to in ((top.cd_sys.clk, top.cd_rtio.clk),
+                          (top.cd_rtio.clk, top.cd_sys.clk)):
+            toolchain.add_max_delay_constraint(platform, from_, to, 8.)
+        platform.add_period_constraint(top.cd_rtio.clk, 8.)
+
+        with tempfile.TemporaryDirectory() as build_dir:
+            platform.build(top, build_dir=build_dir, run=False)
+            with open(os.path.join(build_dir, "top.xdc")) as f:
+                xdc = f.read().splitlines()
+
+        create_clock = [i for i, l in enumerate(xdc)
+                        if l.startswith("create_clock")]
+        max_delay = [i for i, l in enumerate(xdc)
+                     if l.startswith("set_max_delay -datapath_only")]
+        self.assertEqual(len(create_clock), 3)
+        self.assertEqual(len(max_delay), 2)
+        self.assertGreater(min(max_delay), max(create_clock))
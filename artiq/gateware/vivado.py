@@ -0,0 +1,44 @@
+from migen.build.xilinx.vivado import XilinxVivadoToolchain
+
+
+__all__ = ["VivadoToolchain"]
+
+
+class VivadoToolchain(XilinxVivadoToolchain):
+    """Vivado toolchain with support for constraints that refer to clocks,
+    such as datapath-only max delays between clocks.
+
+    Migen only turns period constraints into ``create_clock`` commands at
+    build time, after all the platform commands added during elaboration.
+    Commands that refer to clocks are kept here and emitted right after
+    the clocks are created."""
+    def __init__(self):
+        XilinxVivadoToolchain.__init__(self)
+        self.clock_commands = []
+
+    @classmethod
+    def of_platform(cls, platform):
+        """Return the toolchain of ``platform``, first replacing it with
+        this class if needed. Settings and constraints already registered
+        with the previous toolchain are carried over."""
+        if not isinstance(platform.toolchain, cls):
+            toolchain = cls()
+            toolchain.__dict__.update(platform.toolchain.__dict__)
+            platform.toolchain = toolchain
+        return platform.toolchain
+
+    def add_clock_command(self, platform, command, **signals):
+        self.clock_commands.append((command, signals))
+
+    def add_max_delay_constraint(self, platform, from_, to, delay):
+        self.add_clock_command(platform,
+            "set_max_delay -datapath_only " + str(delay) + " "
+            "-from [get_clocks -of [get_nets {from_}]] "
+            "-to [get_clocks -of [get_nets {to}]]",
+            from_=from_, to=to)
+
+    def _convert_clocks(self, platform):
+        XilinxVivadoToolchain._convert_clocks(self, platform)
+        for command, signals in self.clock_commands:
+            platform.add_platform_command(command, **signals)
+        del self.clock_commands